@@ -5,11 +5,53 @@ Provides easy access to all automation utilities
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, scrolledtext
 import subprocess
 import sys
 import os
+import io
 import threading
+import queue
+import contextlib
+import atexit
+from typing import Optional
+import shutil
+import webbrowser
+
+import test_installation
+
+# Code run by each warm interpreter: preload the heavy modules shared by the
+# tools, then execute the script path written to stdin as __main__
+PREWARM_STUB = """
+import runpy, sys
+for module_name in ("cv2", "numpy", "PIL.ImageGrab", "pyautogui", "pytesseract"):
+    try:
+        __import__(module_name)
+    except Exception:
+        pass
+for line in sys.stdin:
+    script = line.strip()
+    if script:
+        runpy.run_path(script, run_name="__main__")
+"""
+
+# Idle warm interpreters kept ready; each one costs a full cv2/numpy import in RAM
+WARM_POOL_SIZE = 1
+
+class GuiWriter(io.TextIOBase):
+    """Text stream that forwards everything written to a callback on the Tk thread"""
+    
+    def __init__(self, launcher, callback):
+        self.launcher = launcher
+        self.callback = callback
+    
+    def writable(self):
+        return True
+    
+    def write(self, text):
+        if text:
+            self.launcher.call_in_gui(self.callback, text)
+        return len(text)
 
 class AutomationLauncher:
     def __init__(self):
@@ -18,7 +60,25 @@ class AutomationLauncher:
         self.root.geometry("500x400")
         self.root.resizable(False, False)
         
+        self._warm_pool = []
+        self._children = []  # (script, Popen, button) for launched tools still running
+        self._ui_calls = queue.Queue()  # Tk callbacks posted from worker threads
+        
+        # One long-lived background thread runs queued jobs in order
+        self._jobs = queue.Queue()
+        threading.Thread(target=self.run_jobs, daemon=True).start()
+        self._pool_lock = threading.Lock()
+        atexit.register(self.shutdown_warm_pool)
+        
+        # Command used to open files with the default application, resolved once
+        self._opener = self.resolve_opener()
+        
         self.setup_gui()
+        
+        # Warm up interpreters after the window is built so startup isn't delayed
+        self.root.after_idle(self.fill_warm_pool)
+        self.root.after(2000, self.reap_children)
+        self.root.after(50, self.process_ui_calls)
     
     def setup_gui(self):
         """Setup the GUI interface"""
@@ -36,19 +96,19 @@ class AutomationLauncher:
         tools_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 20))
         
         # Main automation tool
-        automation_btn = ttk.Button(tools_frame, text="🎮 Main Automation Tool", 
+        self.automation_btn = ttk.Button(tools_frame, text="🎮 Main Automation Tool", 
                                    command=self.launch_automation, width=30)
-        automation_btn.grid(row=0, column=0, pady=10)
+        self.automation_btn.grid(row=0, column=0, pady=10)
         
         # Template creator
-        template_btn = ttk.Button(tools_frame, text="🖼️ Template Creator", 
+        self.template_btn = ttk.Button(tools_frame, text="🖼️ Template Creator", 
                                  command=self.launch_template_creator, width=30)
-        template_btn.grid(row=1, column=0, pady=10)
+        self.template_btn.grid(row=1, column=0, pady=10)
         
         # Installation test
-        test_btn = ttk.Button(tools_frame, text="🔧 Test Installation", 
+        self.test_btn = ttk.Button(tools_frame, text="🔧 Test Installation", 
                              command=self.run_installation_test, width=30)
-        test_btn.grid(row=2, column=0, pady=10)
+        self.test_btn.grid(row=2, column=0, pady=10)
         
         # Documentation
         docs_btn = ttk.Button(tools_frame, text="📖 View Documentation", 
@@ -80,26 +140,107 @@ class AutomationLauncher:
         self.root.rowconfigure(0, weight=1)
         main_frame.columnconfigure(0, weight=1)
     
+    def call_in_gui(self, func, *args, **kwargs):
+        """Schedule func(*args, **kwargs) on the Tk main thread; safe from any thread"""
+        self._ui_calls.put((func, args, kwargs))
+    
+    def process_ui_calls(self):
+        """Run callbacks queued by worker threads, then poll again"""
+        while True:
+            try:
+                func, args, kwargs = self._ui_calls.get_nowait()
+            except queue.Empty:
+                break
+            # One failing callback (e.g. TclError from a destroyed widget) must not stop the pump
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                print(f"GUI callback {getattr(func, '__name__', func)} failed: {e}", file=sys.stderr)
+        self.root.after(50, self.process_ui_calls)
+    
+    def run_jobs(self):
+        """Background worker: run queued callables one at a time"""
+        while True:
+            job = self._jobs.get()
+            try:
+                job()
+            except Exception as e:
+                self.call_in_gui(messagebox.showerror, "Error", f"Background task failed: {e}")
+    
+    def spawn_warm_interpreter(self) -> subprocess.Popen:
+        """Start an idle interpreter that preloads heavy modules and waits for a script"""
+        return subprocess.Popen([sys.executable, "-u", "-c", PREWARM_STUB],
+                                stdin=subprocess.PIPE, text=True)
+    
+    def fill_warm_pool(self):
+        """Top the warm interpreter pool back up to WARM_POOL_SIZE"""
+        with self._pool_lock:
+            self._warm_pool = [p for p in self._warm_pool if p.poll() is None]
+            while len(self._warm_pool) < WARM_POOL_SIZE:
+                self._warm_pool.append(self.spawn_warm_interpreter())
+    
+    def launch_script(self, script: str, button: Optional[ttk.Button] = None) -> subprocess.Popen:
+        """Hand a script to a warm interpreter, spawning a cold one if none is ready.
+        The button, if given, is re-enabled once the tool exits."""
+        if not os.path.exists(script):
+            raise FileNotFoundError(f"{script} not found")
+        
+        with self._pool_lock:
+            process = None
+            while self._warm_pool and process is None:
+                candidate = self._warm_pool.pop(0)
+                if candidate.poll() is None:
+                    process = candidate
+        
+        if process is None:
+            process = self.spawn_warm_interpreter()
+        
+        # Closing stdin after the path makes the interpreter exit once the tool closes
+        process.stdin.write(script + "\n")
+        process.stdin.close()
+        self._children.append((script, process, button))
+        
+        # Popen doesn't block, so the refill can run right here on the Tk thread
+        self.fill_warm_pool()
+        return process
+    
+    def reap_children(self):
+        """Harvest exit codes of launched tools and report failures"""
+        running = []
+        for script, process, button in self._children:
+            returncode = process.poll()
+            if returncode is None:
+                running.append((script, process, button))
+                continue
+            
+            if button is not None:
+                button.config(state=tk.NORMAL)
+            if returncode != 0:
+                messagebox.showerror("Error", f"{script} exited with code {returncode}")
+        self._children = running
+        self.root.after(2000, self.reap_children)
+    
+    def shutdown_warm_pool(self):
+        """Terminate idle warm interpreters"""
+        with self._pool_lock:
+            for process in self._warm_pool:
+                if process.poll() is None:
+                    process.terminate()
+            self._warm_pool = []
+    
     def launch_automation(self):
         """Launch the main automation tool"""
         try:
             self.status_label.config(text="Launching automation tool...")
-            self.root.update()
-            
-            # Run in separate thread to avoid blocking GUI
-            def run_automation():
-                try:
-                    subprocess.run([sys.executable, "uma_automation.py"], check=True)
-                except subprocess.CalledProcessError as e:
-                    messagebox.showerror("Error", f"Failed to launch automation tool: {e}")
-                except FileNotFoundError:
-                    messagebox.showerror("Error", "uma_automation.py not found")
+            self.root.update_idletasks()
             
-            thread = threading.Thread(target=run_automation, daemon=True)
-            thread.start()
+            # Disabled until the tool exits so it can't be double-launched
+            self.automation_btn.config(state=tk.DISABLED)
+            self.launch_script("uma_automation.py", self.automation_btn)
             
             self.status_label.config(text="Automation tool launched")
         except Exception as e:
+            self.automation_btn.config(state=tk.NORMAL)
             messagebox.showerror("Error", f"Failed to launch automation tool: {e}")
             self.status_label.config(text="Error launching automation tool")
     
@@ -107,21 +248,15 @@ class AutomationLauncher:
         """Launch the template creator tool"""
         try:
             self.status_label.config(text="Launching template creator...")
-            self.root.update()
+            self.root.update_idletasks()
             
-            def run_template_creator():
-                try:
-                    subprocess.run([sys.executable, "template_creator.py"], check=True)
-                except subprocess.CalledProcessError as e:
-                    messagebox.showerror("Error", f"Failed to launch template creator: {e}")
-                except FileNotFoundError:
-                    messagebox.showerror("Error", "template_creator.py not found")
-            
-            thread = threading.Thread(target=run_template_creator, daemon=True)
-            thread.start()
+            # Disabled until the tool exits so it can't be double-launched
+            self.template_btn.config(state=tk.DISABLED)
+            self.launch_script("template_creator.py", self.template_btn)
             
             self.status_label.config(text="Template creator launched")
         except Exception as e:
+            self.template_btn.config(state=tk.NORMAL)
             messagebox.showerror("Error", f"Failed to launch template creator: {e}")
             self.status_label.config(text="Error launching template creator")
     
@@ -129,37 +264,73 @@ class AutomationLauncher:
         """Run the installation test"""
         try:
             self.status_label.config(text="Running installation test...")
-            self.root.update()
+            self.root.update_idletasks()
             
+            self.test_btn.config(state=tk.DISABLED)
+            output_text = self.open_test_output()
+            
+            # Run in-process on the job thread, streaming output into the window
             def run_test():
+                writer = GuiWriter(self, lambda text: self.append_test_output(output_text, text))
                 try:
-                    result = subprocess.run([sys.executable, "test_installation.py"], 
-                                          capture_output=True, text=True, check=True)
-                    messagebox.showinfo("Installation Test", f"Test completed successfully!\n\n{result.stdout}")
-                except subprocess.CalledProcessError as e:
-                    messagebox.showerror("Installation Test", f"Test failed:\n\n{e.stdout}\n{e.stderr}")
-                except FileNotFoundError:
-                    messagebox.showerror("Error", "test_installation.py not found")
-            
-            thread = threading.Thread(target=run_test, daemon=True)
-            thread.start()
+                    with contextlib.redirect_stdout(writer):
+                        ok = test_installation.main()
+                except Exception as e:
+                    self.call_in_gui(self.test_btn.config, state=tk.NORMAL)
+                    self.call_in_gui(messagebox.showerror, "Installation Test", f"Test crashed: {e}")
+                    self.call_in_gui(self.status_label.config, text="Error running installation test")
+                    return
+                
+                self.call_in_gui(self.test_btn.config, state=tk.NORMAL)
+                if ok:
+                    self.call_in_gui(self.status_label.config, text="Installation test passed")
+                else:
+                    self.call_in_gui(self.status_label.config, text="Installation test failed - see output window")
             
-            self.status_label.config(text="Installation test completed")
+            self._jobs.put(run_test)
         except Exception as e:
+            self.test_btn.config(state=tk.NORMAL)
             messagebox.showerror("Error", f"Failed to run installation test: {e}")
             self.status_label.config(text="Error running installation test")
     
+    def open_test_output(self) -> scrolledtext.ScrolledText:
+        """Open a window that shows installation test output as it is produced"""
+        window = tk.Toplevel(self.root)
+        window.title("Installation Test")
+        output_text = scrolledtext.ScrolledText(window, height=25, width=80)
+        output_text.pack(fill=tk.BOTH, expand=True)
+        return output_text
+    
+    @staticmethod
+    def append_test_output(output_text: scrolledtext.ScrolledText, text: str):
+        """Append streamed test output, ignoring it if the window was closed"""
+        if output_text.winfo_exists():
+            output_text.insert(tk.END, text)
+            output_text.see(tk.END)
+    
+    @staticmethod
+    def resolve_opener() -> tuple:
+        """Find the command that opens a file with its default application"""
+        if sys.platform == "darwin":  # macOS
+            return ("open",)
+        elif sys.platform == "win32":  # Windows
+            return ("cmd", "/c", "start", "")
+        else:  # Linux
+            opener = shutil.which("xdg-open") or shutil.which("gio")
+            if opener is None:
+                return ()
+            return (opener, "open") if opener.endswith("gio") else (opener,)
+    
     def open_documentation(self):
         """Open the README documentation"""
         try:
             readme_path = "README.md"
             if os.path.exists(readme_path):
-                if sys.platform == "darwin":  # macOS
-                    subprocess.run(["open", readme_path])
-                elif sys.platform == "win32":  # Windows
-                    subprocess.run(["start", readme_path], shell=True)
-                else:  # Linux
-                    subprocess.run(["xdg-open", readme_path])
+                # Popen so the GUI doesn't wait for the viewer (xdg-open can block)
+                if self._opener:
+                    subprocess.Popen(self._opener + (readme_path,))
+                else:
+                    webbrowser.open(os.path.abspath(readme_path))
                 
                 self.status_label.config(text="Documentation opened")
             else:
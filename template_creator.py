@@ -4,16 +4,18 @@ Template Creator Utility for Uma Musume PC Automation
 Helps users create template images for UI element recognition
 """
 
-import cv2
-import numpy as np
-import pyautogui
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from PIL import Image, ImageTk, ImageGrab
+from PIL import Image, ImageTk
 import os
 import json
 from typing import Tuple, Optional
 
+try:
+    import mss
+except ImportError:
+    mss = None
+
 class TemplateCreator:
     def __init__(self):
         self.root = tk.Tk()
@@ -25,13 +27,21 @@ class TemplateCreator:
         self.selection_start = None
         self.selection_end = None
         self.drawing = False
+        self._pending_redraw = False
+        self._last_pos = None
+        self._sel_rect = None  # Canvas item reused for the selection rectangle
+        self._image_grab = None  # PIL.ImageGrab, imported on first capture
+        self._sct = None  # mss instance, reused across captures
+        self._detector = None  # WindowDetector, created on first game window capture
+        self._canvas_size = (0, 0)  # Updated from <Configure> events
         
         # Ensure templates directory exists
         if not os.path.exists(self.templates_dir):
             os.makedirs(self.templates_dir)
         
         self.setup_gui()
-        self.load_template_list()
+        # Scan templates once the window has painted
+        self.root.after_idle(self.load_template_list)
     
     def setup_gui(self):
         """Setup the GUI interface"""
@@ -119,11 +129,39 @@ class TemplateCreator:
         self.canvas.bind("<Button-1>", self.on_mouse_down)
         self.canvas.bind("<B1-Motion>", self.on_mouse_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_mouse_up)
+        self.canvas.bind("<Configure>", self.on_canvas_resize)
+    
+    def get_image_grab(self):
+        """Import PIL.ImageGrab on first use so the window can paint first"""
+        if self._image_grab is None:
+            from PIL import ImageGrab
+            self._image_grab = ImageGrab
+        return self._image_grab
+    
+    def grab_screen(self) -> Tuple[Image.Image, Tuple[int, int]]:
+        """Grab the whole screen as an RGB image, using mss when available.
+        Returns the image and the screen coordinates of its top-left corner."""
+        if mss is None:
+            return self.get_image_grab().grab(), (0, 0)
+        
+        if self._sct is None:
+            self._sct = mss.mss()
+        monitor = self._sct.monitors[0]
+        raw = self._sct.grab(monitor)
+        return Image.frombytes("RGB", raw.size, raw.rgb), (monitor["left"], monitor["top"])
+    
+    def get_window_detector(self):
+        """Create the WindowDetector once and reuse it for later captures"""
+        if self._detector is None:
+            # Imported here: window_detector pulls in cv2, which would slow startup
+            from window_detector import WindowDetector
+            self._detector = WindowDetector()
+        return self._detector
     
     def capture_screen(self):
         """Capture the entire screen"""
         try:
-            screenshot = ImageGrab.grab()
+            screenshot, _ = self.grab_screen()
             self.display_screenshot(screenshot)
             messagebox.showinfo("Success", "Screenshot captured successfully!")
         except Exception as e:
@@ -131,28 +169,37 @@ class TemplateCreator:
     
     def capture_game_window(self):
         """Capture only the game window"""
+        # Grab once; the game window is cropped from this instead of a second grab
+        try:
+            screenshot, (left, top) = self.grab_screen()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to capture screenshot: {e}")
+            return
+        
         try:
             # Try to find Uma Musume window
-            from window_detector import WindowDetector
-            detector = WindowDetector()
+            detector = self.get_window_detector()
+            detector.invalidate_cache()  # Window may have moved since the last capture
             game_region = detector.get_game_region()
-            
-            if game_region:
-                screenshot = ImageGrab.grab(bbox=game_region)
-                self.display_screenshot(screenshot)
-                messagebox.showinfo("Success", "Game window captured successfully!")
-            else:
-                messagebox.showwarning("Warning", "Game window not detected. Capturing full screen instead.")
-                self.capture_screen()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to capture game window: {e}")
-            self.capture_screen()
+            game_region = None
+        else:
+            if not game_region:
+                messagebox.showwarning("Warning", "Game window not detected. Capturing full screen instead.")
+        
+        if game_region:
+            x1, y1, x2, y2 = game_region
+            screenshot = screenshot.crop((x1 - left, y1 - top, x2 - left, y2 - top))
+            self.display_screenshot(screenshot)
+            messagebox.showinfo("Success", "Game window captured successfully!")
+        else:
+            self.display_screenshot(screenshot)
     
     def display_screenshot(self, screenshot: Image.Image):
         """Display screenshot on canvas"""
         # Resize screenshot to fit canvas
-        canvas_width = self.canvas.winfo_width()
-        canvas_height = self.canvas.winfo_height()
+        canvas_width, canvas_height = self._canvas_size
         
         if canvas_width <= 1 or canvas_height <= 1:
             # Canvas not yet sized, use default
@@ -161,12 +208,24 @@ class TemplateCreator:
         # Calculate scale to fit image in canvas
         img_width, img_height = screenshot.size
         scale = min(canvas_width / img_width, canvas_height / img_height)
+        if scale >= 0.99:
+            # Shown at native size; scale_factor must match what is displayed
+            scale = 1.0
         
         new_width = int(img_width * scale)
         new_height = int(img_height * scale)
         
-        # Resize image
-        screenshot_resized = screenshot.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        # Resize image for preview only; the original is kept for template crops
+        if scale == 1.0:
+            screenshot_resized = screenshot
+        else:
+            # Integer box-filter reduction first so the filtered resize touches fewer pixels
+            reduce_factor = int(1.0 / scale)
+            source = screenshot.reduce(reduce_factor) if reduce_factor >= 2 else screenshot
+            
+            # LANCZOS only when heavy downscaling would make aliasing visible
+            resample = Image.Resampling.BILINEAR if scale > 0.5 else Image.Resampling.LANCZOS
+            screenshot_resized = source.resize((new_width, new_height), resample)
         
         # Convert to PhotoImage
         self.photo_image = ImageTk.PhotoImage(screenshot_resized)
@@ -175,23 +234,43 @@ class TemplateCreator:
         # Clear canvas and display image
         self.canvas.delete("all")
         self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo_image)
+        self._sel_rect = self.canvas.create_rectangle(0, 0, 0, 0, outline="red", width=2,
+                                                      state="hidden", tags="selection")
         
         # Store scale for coordinate conversion
         self.scale_factor = scale
     
+    def on_canvas_resize(self, event):
+        """Cache canvas size so display doesn't have to query Tk"""
+        self._canvas_size = (event.width, event.height)
+    
     def on_mouse_down(self, event):
         """Handle mouse button press"""
         self.selection_start = (event.x, event.y)
         self.drawing = True
-        self.canvas.delete("selection")
+        if self._sel_rect is not None:
+            self.canvas.coords(self._sel_rect, event.x, event.y, event.x, event.y)
+            self.canvas.itemconfigure(self._sel_rect, state="normal")
     
     def on_mouse_drag(self, event):
         """Handle mouse drag"""
         if self.drawing and self.selection_start:
-            self.canvas.delete("selection")
+            # Coalesce motion events into at most one redraw per idle cycle
+            self._last_pos = (event.x, event.y)
+            if not self._pending_redraw:
+                self._pending_redraw = True
+                self.root.after_idle(self._redraw_selection)
+    
+    def _redraw_selection(self):
+        """Redraw the selection rectangle at the latest drag position"""
+        self._pending_redraw = False
+        if not self.drawing or not self.selection_start or not self._last_pos:
+            return
+        
+        if self._sel_rect is not None:
             x1, y1 = self.selection_start
-            x2, y2 = event.x, event.y
-            self.canvas.create_rectangle(x1, y1, x2, y2, outline="red", width=2, tags="selection")
+            x2, y2 = self._last_pos
+            self.canvas.coords(self._sel_rect, x1, y1, x2, y2)
     
     def on_mouse_up(self, event):
         """Handle mouse button release"""
@@ -202,7 +281,8 @@ class TemplateCreator:
             # Draw final selection rectangle
             x1, y1 = self.selection_start
             x2, y2 = self.selection_end
-            self.canvas.create_rectangle(x1, y1, x2, y2, outline="red", width=2, tags="selection")
+            if self._sel_rect is not None:
+                self.canvas.coords(self._sel_rect, x1, y1, x2, y2)
     
     def save_template(self):
         """Save the selected region as a template"""
@@ -253,17 +333,21 @@ class TemplateCreator:
         """Clear the current selection"""
         self.selection_start = None
         self.selection_end = None
-        self.canvas.delete("selection")
+        if self._sel_rect is not None:
+            self.canvas.itemconfigure(self._sel_rect, state="hidden")
     
     def load_template_list(self):
         """Load and display existing templates"""
         self.template_listbox.delete(0, tk.END)
         
         if os.path.exists(self.templates_dir):
-            for filename in os.listdir(self.templates_dir):
-                if filename.endswith(('.png', '.jpg', '.jpeg')):
-                    template_name = os.path.splitext(filename)[0]
-                    self.template_listbox.insert(tk.END, template_name)
+            with os.scandir(self.templates_dir) as entries:
+                names = [entry.name.rpartition('.')[0] for entry in entries
+                         if entry.is_file() and entry.name.endswith(('.png', '.jpg', '.jpeg'))]
+            
+            # Single Tcl call for the whole list
+            if names:
+                self.template_listbox.insert(tk.END, *names)
     
     def delete_template(self):
         """Delete the selected template"""
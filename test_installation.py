@@ -6,18 +6,31 @@ Tests all dependencies and basic functionality
 
 import sys
 import importlib
+import importlib.util
 import subprocess
 import platform
 
-def test_import(module_name, package_name=None):
-    """Test if a module can be imported"""
+def check_import(module_name):
+    """Check a module is importable without executing it.
+    Returns the ImportError on failure or None on success."""
     try:
-        importlib.import_module(module_name)
+        if importlib.util.find_spec(module_name) is None:
+            return ImportError(f"No module named '{module_name}'")
+        return None
+    except (ImportError, ValueError) as e:
+        return e
+
+def report_import(module_name, package_name, error):
+    """Print the result of an import check"""
+    if error is None:
         print(f"✓ {package_name or module_name} - OK")
         return True
-    except ImportError as e:
-        print(f"✗ {package_name or module_name} - FAILED: {e}")
-        return False
+    print(f"✗ {package_name or module_name} - FAILED: {error}")
+    return False
+
+def test_import(module_name, package_name=None):
+    """Test if a module can be imported"""
+    return report_import(module_name, package_name, check_import(module_name))
 
 def test_tesseract():
     """Test if Tesseract OCR is available"""
@@ -34,10 +47,17 @@ def test_tesseract():
 def test_screen_capture():
     """Test screen capture functionality"""
     try:
-        from PIL import ImageGrab
         # Try to capture a small region
-        screenshot = ImageGrab.grab(bbox=(0, 0, 100, 100))
-        print("✓ Screen Capture - OK")
+        try:
+            import mss
+            with mss.mss() as sct:
+                screenshot = sct.grab((0, 0, 100, 100))
+            backend = "mss"
+        except ImportError:
+            from PIL import ImageGrab
+            screenshot = ImageGrab.grab(bbox=(0, 0, 100, 100))
+            backend = "PIL.ImageGrab"
+        print(f"✓ Screen Capture - OK ({backend})")
         return True
     except Exception as e:
         print(f"✗ Screen Capture - FAILED: {e}")
@@ -90,9 +110,10 @@ def main():
         ("configparser", "ConfigParser"),
     ]
     
+    # find_spec only locates each module without importing it, so a plain loop is enough
     all_modules_ok = True
     for module_name, package_name in modules:
-        if not test_import(module_name, package_name):
+        if not report_import(module_name, package_name, check_import(module_name)):
             all_modules_ok = False
     
     print()
@@ -10,37 +10,179 @@ import pyautogui
 import pytesseract
 import time
 import json
+import re
 import logging
+import logging.handlers
 from PIL import Image, ImageGrab
 from typing import Tuple, Optional, List, Dict
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import threading
+import queue
 import configparser
+import functools
+import collections
+import ctypes
+import sys
 import os
 from window_detector import WindowDetector
 
+try:
+    import mss
+except ImportError:
+    mss = None
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+try:
+    from Xlib import X, display as xdisplay
+    from Xlib.ext import xtest
+except ImportError:
+    xtest = None
+
+# click_at paces itself; pyautogui's per-call PAUSE only adds idle time
+pyautogui.PAUSE = 0
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Screen templates checked by detect_screen, in priority order
+SCREEN_TEMPLATES = ('main_menu', 'training_screen', 'race_screen', 'event_screen')
+# OCR keywords that mean an error dialog is showing
+ERROR_INDICATORS = ('error', 'failed', 'connection lost', 'retry')
+
+# Likely next screens for each screen, tried before the full SCREEN_TEMPLATES search
+SCREEN_TRANSITIONS = {
+    'main_menu': ('training_screen', 'race_screen'),
+    'training_screen': ('training_screen', 'event_screen'),
+    'event_screen': ('training_screen', 'event_screen'),
+    'race_screen': ('main_menu', 'training_screen'),
+}
+
+# Default match thresholds per method; CCORR scores run higher than CCOEFF
+MATCH_THRESHOLDS = {cv2.TM_CCORR_NORMED: 0.95, cv2.TM_CCOEFF_NORMED: 0.8}
+
+# Coarse matching runs at 1/PYRAMID_FACTOR scale (two pyrDown levels)
+PYRAMID_FACTOR = 4
+# Templates smaller than this at coarse scale are matched at full resolution only
+MIN_COARSE_SIZE = 4
+# Padding (full-resolution pixels) around the coarse hit for the verification pass
+REFINE_MARGIN = 8
+
+# Frame-change gate: thumbnail size and mean absolute difference that counts as a change
+CHANGE_THUMB_SIZE = (64, 36)
+CHANGE_THRESHOLD = 2.0
+# Interval between grabs in the capture thread
+CAPTURE_INTERVAL = 0.05
+
+# GUI log bridge: queued records (newest dropped when full), drain interval and batch size
+LOG_QUEUE_SIZE = 1000
+LOG_POLL_MS = 250
+LOG_BATCH = 200
+
+# Win32 SendInput structures for left-button down/up
+INPUT_MOUSE = 0
+MOUSEEVENTF_LEFTDOWN = 0x0002
+MOUSEEVENTF_LEFTUP = 0x0004
+
+class _MOUSEINPUT(ctypes.Structure):
+    _fields_ = [('dx', ctypes.c_long), ('dy', ctypes.c_long), ('mouseData', ctypes.c_ulong),
+                ('dwFlags', ctypes.c_ulong), ('time', ctypes.c_ulong), ('dwExtraInfo', ctypes.c_size_t)]
+
+class _INPUT(ctypes.Structure):
+    # MOUSEINPUT is the largest member of the INPUT union, so it alone gives the right size
+    _fields_ = [('type', ctypes.c_ulong), ('mi', _MOUSEINPUT)]
+
+# Cached padded template spectra (about 1 MB each at 1080p)
+SPECTRUM_CACHE_SIZE = 32
+
+# Templates with fewer pixels than this are matched by SAD when numba is installed
+SAD_MAX_AREA = 4096
+
+if numba is not None:
+    @numba.njit(cache=True, fastmath=True, parallel=True)
+    def _sad_map(frame, template, stride):
+        """Sum of absolute differences between template and frame at every stride-th position"""
+        th, tw = template.shape
+        rows = (frame.shape[0] - th) // stride + 1
+        cols = (frame.shape[1] - tw) // stride + 1
+        scores = np.empty((rows, cols), dtype=np.float32)
+        for r in numba.prange(rows):
+            y = r * stride
+            for c in range(cols):
+                x = c * stride
+                total = 0.0
+                for i in range(th):
+                    for j in range(tw):
+                        total += abs(frame[y + i, x + j] - template[i, j])
+                scores[r, c] = total
+        return scores
+
+def _sad_match(frame: np.ndarray, template: np.ndarray) -> Tuple[int, int, float]:
+    """Best SAD position of template in frame: stride-2 scan, then refine around the winner.
+    Returns (x, y, sad) of the top-left corner."""
+    th, tw = template.shape
+    scores = _sad_map(frame, template, 2)
+    r, c = np.unravel_index(np.argmin(scores), scores.shape)
+    
+    x0, y0 = max(2 * int(c) - 1, 0), max(2 * int(r) - 1, 0)
+    local = _sad_map(frame[y0:y0 + th + 2, x0:x0 + tw + 2], template, 1)
+    r, c = np.unravel_index(np.argmin(local), local.shape)
+    return x0 + int(c), y0 + int(r), float(local[r, c])
+
 class UmaMusumeAutomation:
     def __init__(self):
         self.running = False
         self.config = self.load_config()
+        self.apply_config()
         self.screen_width, self.screen_height = pyautogui.size()
+        self._click = self._make_clicker()
         
         # Window detection
         self.window_detector = WindowDetector()
         self.game_region = None
         
+        # mss keeps its display/DC handles thread-local, so each capturing thread gets
+        # its own instance from _screen_grabber (PIL.ImageGrab if mss is missing or fails)
+        self._sct_local = threading.local()
+        # Latest frame from the capture thread; holds one frame, older ones are dropped
+        self._frame_q = queue.Queue(maxsize=1)
+        
         # OCR Configuration for English text
         pytesseract.pytesseract.tesseract_cmd = self.config.get('OCR', 'tesseract_path', fallback='tesseract')
+        self._clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        # One pass over the OCR text for all error keywords
+        self._error_re = re.compile('|'.join(map(re.escape, ERROR_INDICATORS)), re.IGNORECASE)
         
-        # UI element templates (will be loaded from templates folder)
-        self.templates = {}
+        # Persistent Tesseract session; pytesseract spawns the CLI for every call
+        self._tess = None
+        if tesserocr is not None:
+            try:
+                self._tess = tesserocr.PyTessBaseAPI(lang='eng', psm=tesserocr.PSM.SINGLE_BLOCK)
+            except Exception as e:
+                logger.warning(f"tesserocr unavailable, using pytesseract: {e}")
+        
+        # UI element templates, read from the templates folder on first use
+        self.templates_dir = 'templates'
+        self.mean_subtract_templates = set()  # matched with TM_CCOEFF_NORMED instead of CCORR
+        self._load_template = functools.lru_cache(maxsize=64)(self._read_template)
+        # Padded template spectra are ~1 MB each (per frame DFT size), so keep fewer of them
+        self._template_spectrum = functools.lru_cache(maxsize=SPECTRUM_CACHE_SIZE)(
+            self._compute_template_spectrum)
         self.load_templates()
         
+        # FFT matching cache: per-frame data
+        self._frame = None
+        
         # Game state tracking
         self.current_screen = "unknown"
         self.turn_count = 0
@@ -49,14 +191,20 @@ class UmaMusumeAutomation:
             'guts': 0, 'intelligence': 0, 'technique': 0
         }
         
-        # Performance tracking
-        self.session_stats = {
+        # Performance tracking; the GUI thread reads snapshots via get_session_stats
+        self.session_stats = collections.Counter({
             'training_sessions': 0,
             'races_completed': 0,
             'events_handled': 0,
             'errors_encountered': 0
-        }
+        })
         
+    def __del__(self):
+        """Release the Tesseract session"""
+        tess = getattr(self, '_tess', None)
+        if tess is not None:
+            tess.End()
+    
     def load_config(self) -> configparser.ConfigParser:
         """Load configuration from config.ini"""
         config = configparser.ConfigParser()
@@ -86,26 +234,80 @@ class UmaMusumeAutomation:
         
         return config
     
+    def apply_config(self):
+        """Cache hot-path config values as attributes; call again after changing self.config"""
+        self._window_detect = self.config.getboolean('Automation', 'window_detection_enabled', fallback=True)
+        self._screenshot_delay = float(self.config.get('Automation', 'screenshot_delay', fallback='1.0'))
+        self._skip_races = self.config.getboolean('Training', 'skip_races', fallback=False)
+    
     def load_templates(self):
-        """Load UI element templates from templates folder"""
-        templates_dir = 'templates'
+        """Prepare the templates folder and read templates.json; images load lazily"""
+        templates_dir = self.templates_dir
         if not os.path.exists(templates_dir):
             os.makedirs(templates_dir)
             logger.info(f"Created templates directory: {templates_dir}")
             return
         
-        for filename in os.listdir(templates_dir):
-            if filename.endswith(('.png', '.jpg', '.jpeg')):
-                template_name = os.path.splitext(filename)[0]
-                template_path = os.path.join(templates_dir, filename)
-                self.templates[template_name] = cv2.imread(template_path, cv2.IMREAD_COLOR)
-                logger.info(f"Loaded template: {template_name}")
+        # Optional per-template settings, e.g. {"race_screen": {"needs_mean_subtract": true}}
+        settings_path = os.path.join(templates_dir, 'templates.json')
+        if os.path.exists(settings_path):
+            try:
+                with open(settings_path) as f:
+                    settings = json.load(f)
+                self.mean_subtract_templates = {name for name, opts in settings.items()
+                                                if opts.get('needs_mean_subtract')}
+            except (OSError, ValueError, AttributeError) as e:
+                logger.error(f"Failed to read {settings_path}: {e}")
+        
+        # Templates loaded before a settings change must pick up the new method
+        self._load_template.cache_clear()
+        self._template_spectrum.cache_clear()
+    
+    def _read_template(self, template_name: str) -> Optional[Dict]:
+        """Read one template from disk; called through the _load_template LRU cache.
+        Returns {'template', 'small', 'size', 'sad'} or None if there is no such file."""
+        for ext in ('.png', '.jpg', '.jpeg'):
+            template_path = os.path.join(self.templates_dir, template_name + ext)
+            if os.path.exists(template_path):
+                break
+        else:
+            return None
+        
+        # Grayscale only: shapes matter for UI matching, color just triples the work.
+        # Stored as aligned, contiguous float32 so matchTemplate skips per-call conversion
+        template = cv2.imread(template_path, cv2.IMREAD_GRAYSCALE)
+        if template is None:
+            logger.error(f"Failed to read template: {template_path}")
+            return None
+        template = np.require(template, dtype=np.float32, requirements=['A', 'C'])
+        logger.info(f"Loaded template: {template_name}")
+        return {
+            'template': template,
+            'small': cv2.resize(template, None, fx=1 / PYRAMID_FACTOR, fy=1 / PYRAMID_FACTOR,
+                                interpolation=cv2.INTER_AREA),
+            'size': (template.shape[1], template.shape[0]),  # (width, height)
+            # SAD has no brightness normalization, so mean-subtracted templates stay on NCC
+            'sad': (numba is not None and template.size < SAD_MAX_AREA
+                    and template_name not in self.mean_subtract_templates)
+        }
+    
+    def _screen_grabber(self):
+        """mss instance for the calling thread, created on first use; None to use ImageGrab"""
+        if not hasattr(self._sct_local, 'sct'):
+            self._sct_local.sct = None
+            if mss is not None:
+                try:
+                    self._sct_local.sct = mss.mss()
+                except Exception as e:
+                    logger.warning(f"mss unavailable, using PIL.ImageGrab: {e}")
+        return self._sct_local.sct
     
     def capture_screen(self, region: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
         """Capture screen or region of screen"""
         try:
-            # Update game region if window detection is enabled
-            if self.config.getboolean('Automation', 'window_detection_enabled', fallback=True):
+            # Update game region if window detection is enabled; the detector
+            # caches the window lookup, so this only queries the OS every few seconds
+            if self._window_detect:
                 self.game_region = self.window_detector.get_game_region()
             
             # Use game region if available and no specific region requested
@@ -113,6 +315,23 @@ class UmaMusumeAutomation:
                 region = self.game_region
                 logger.debug(f"Using game region: {region}")
             
+            sct = self._screen_grabber()
+            if sct is not None:
+                if region:
+                    x1, y1, x2, y2 = region
+                    monitor = {"left": x1, "top": y1, "width": x2 - x1, "height": y2 - y1}
+                else:
+                    monitor = sct.monitors[1]  # Primary monitor, like ImageGrab.grab()
+                
+                try:
+                    raw = sct.grab(monitor)
+                except mss.ScreenShotError as e:
+                    logger.warning(f"mss grab failed, falling back to PIL.ImageGrab: {e}")
+                else:
+                    # View the BGRA buffer in place and drop alpha: no PIL or cvtColor copies
+                    frame = np.frombuffer(raw.raw, dtype=np.uint8).reshape(raw.height, raw.width, 4)
+                    return frame[:, :, :3]
+            
             if region:
                 screenshot = ImageGrab.grab(bbox=region)
             else:
@@ -125,212 +344,460 @@ class UmaMusumeAutomation:
             logger.error(f"Failed to capture screen: {e}")
             return None
     
-    def find_template(self, template_name: str, screenshot: np.ndarray, 
-                     threshold: float = 0.8) -> Optional[Tuple[int, int, int, int]]:
-        """Find template in screenshot using template matching"""
-        if template_name not in self.templates:
-            logger.warning(f"Template {template_name} not found")
+    def _capture_worker(self):
+        """Capture thread: keep the newest frame in _frame_q while automation runs.
+        Grabs with this thread's own mss instance, closed when the loop ends."""
+        try:
+            while self.running:
+                frame = self.capture_screen()
+                if frame is None:
+                    time.sleep(1)
+                    continue
+                
+                try:
+                    self._frame_q.put_nowait(frame)
+                except queue.Full:
+                    # Replace the unconsumed frame; this thread is the only producer
+                    try:
+                        self._frame_q.get_nowait()
+                    except queue.Empty:
+                        pass
+                    self._frame_q.put_nowait(frame)
+                time.sleep(CAPTURE_INTERVAL)
+        finally:
+            # Each run starts a new capture thread; release this one's display/DC handles
+            sct = self._sct_local.__dict__.pop('sct', None)
+            if sct is not None:
+                sct.close()
+    
+    @staticmethod
+    def _gray(image: np.ndarray) -> np.ndarray:
+        """Grayscale view of a BGR or already-gray image"""
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    
+    @classmethod
+    def _thumbnail(cls, image: np.ndarray) -> np.ndarray:
+        """Small uint8 grayscale thumbnail (CHANGE_THUMB_SIZE) for the frame-change gate.
+        Point-samples the frame down to ~4x the thumbnail first, so only a few
+        thousand pixels get converted and area-filtered."""
+        thumb_w, thumb_h = CHANGE_THUMB_SIZE
+        step_y = max(image.shape[0] // (thumb_h * 4), 1)
+        step_x = max(image.shape[1] // (thumb_w * 4), 1)
+        sampled = np.ascontiguousarray(image[::step_y, ::step_x])
+        return cv2.resize(cls._gray(sampled), CHANGE_THUMB_SIZE, interpolation=cv2.INTER_AREA)
+    
+    def _frame_data(self, gray: np.ndarray) -> Dict:
+        """Pyramid plus FFT and integral images of the coarse level, computed once per gray frame"""
+        if self._frame is not None and self._frame['source'] is gray:
+            return self._frame
+        
+        small = cv2.pyrDown(cv2.pyrDown(gray))
+        height, width = small.shape
+        dft_shape = (cv2.getOptimalDFTSize(height), cv2.getOptimalDFTSize(width))
+        padded = np.zeros(dft_shape, dtype=np.float32)
+        padded[:height, :width] = small
+        
+        sums, sqsums = cv2.integral2(small, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        self._frame = {
+            'source': gray,
+            'gray': gray,
+            'shape': (height, width),
+            'dft_shape': dft_shape,
+            'small': small,
+            'spectrum': cv2.dft(padded, flags=cv2.DFT_COMPLEX_OUTPUT),
+            'sums': sums,
+            'sqsums': sqsums
+        }
+        return self._frame
+    
+    def _match_method(self, template_name: str) -> int:
+        """TM_CCORR_NORMED by default; TM_CCOEFF_NORMED for templates flagged in templates.json"""
+        if template_name in self.mean_subtract_templates:
+            return cv2.TM_CCOEFF_NORMED
+        return cv2.TM_CCORR_NORMED
+    
+    def _compute_template_spectrum(self, template_name: str,
+                                   dft_shape: Tuple[int, int]) -> Tuple[np.ndarray, float]:
+        """Spectrum of the coarse template padded to dft_shape, plus its squared norm;
+        called through the _template_spectrum LRU cache.
+        The template is made zero-mean first when it is matched with TM_CCOEFF_NORMED."""
+        template = self._load_template(template_name)['small']
+        if self._match_method(template_name) == cv2.TM_CCOEFF_NORMED:
+            template = template - float(template.mean())
+        
+        padded = np.zeros(dft_shape, dtype=np.float32)
+        padded[:template.shape[0], :template.shape[1]] = template
+        spectrum = cv2.dft(padded, flags=cv2.DFT_COMPLEX_OUTPUT)
+        return spectrum, float((template * template).sum())
+    
+    def _coarse_match(self, template_name: str, frame: Dict) -> Optional[Tuple[float, Tuple[int, int]]]:
+        """
+        Match a coarse template against the coarse frame via the shared frame FFT.
+        Scores emulate the template's matchTemplate method. Returns (max_val, max_loc)
+        or None if it can't fit.
+        """
+        height, width = frame['shape']
+        h, w = self._load_template(template_name)['small'].shape[:2]
+        if h > height or w > width:
             return None
         
-        template = self.templates[template_name]
-        result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
-        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+        # Cross-correlation with the template via the frequency domain
+        spectrum, template_norm = self._template_spectrum(template_name, frame['dft_shape'])
+        correlation = cv2.idft(cv2.mulSpectrums(frame['spectrum'], spectrum, 0, conjB=True),
+                               flags=cv2.DFT_REAL_OUTPUT | cv2.DFT_SCALE)
+        numerator = correlation[:height - h + 1, :width - w + 1].astype(np.float64)
+        
+        # Local window energy (CCORR) or variance (CCOEFF) of the frame from the integral images
+        sums, sqsums = frame['sums'], frame['sqsums']
+        window_energy = sqsums[h:, w:] - sqsums[:-h, w:] - sqsums[h:, :-w] + sqsums[:-h, :-w]
+        if self._match_method(template_name) == cv2.TM_CCOEFF_NORMED:
+            window_sum = sums[h:, w:] - sums[:-h, w:] - sums[h:, :-w] + sums[:-h, :-w]
+            window_energy = np.maximum(window_energy - window_sum * window_sum / (h * w), 0)
+        denominator = np.sqrt(window_energy * template_norm)
+        
+        scores = np.zeros_like(numerator)
+        np.divide(numerator, denominator, out=scores, where=denominator > 1e-6)
+        _, max_val, _, max_loc = cv2.minMaxLoc(scores)
+        return max_val, max_loc
+    
+    def _refine_match(self, template_name: str, gray: np.ndarray, coarse_loc: Optional[Tuple[int, int]],
+                      threshold: float) -> Optional[Tuple[int, int, float]]:
+        """Verify a match at full resolution, in a small ROI around coarse_loc if given.
+        Returns (center_x, center_y, max_val) or None."""
+        record = self._load_template(template_name)
+        template = record['template']
+        w, h = record['size']
+        
+        x0, y0 = 0, 0
+        roi = gray
+        if coarse_loc is not None:
+            x0 = max(coarse_loc[0] * PYRAMID_FACTOR - REFINE_MARGIN, 0)
+            y0 = max(coarse_loc[1] * PYRAMID_FACTOR - REFINE_MARGIN, 0)
+            roi = gray[y0:y0 + h + 2 * REFINE_MARGIN, x0:x0 + w + 2 * REFINE_MARGIN]
+        
+        if roi.shape[0] < h or roi.shape[1] < w:
+            return None
         
+        result = cv2.matchTemplate(roi, template, self._match_method(template_name))
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
         if max_val >= threshold:
-            h, w = template.shape[:2]
-            x, y = max_loc
-            return (x, y, x + w, y + h)
+            x, y = x0 + max_loc[0], y0 + max_loc[1]
+            return (x + w // 2, y + h // 2, max_val)
+        return None
+    
+    def _sad_template_match(self, template_name: str, frame: Dict,
+                            threshold: float) -> Optional[Tuple[int, int, float]]:
+        """SAD match for small templates: coarse level first when the template survives
+        downscaling, then full resolution. Scores are 1 - SAD / (255 * pixels).
+        Returns (center_x, center_y, score) or None."""
+        record = self._load_template(template_name)
+        template, small = record['template'], record['small']
+        w, h = record['size']
+        gray = frame['gray']
+        
+        x0, y0 = 0, 0
+        roi = gray
+        if min(small.shape[:2]) >= MIN_COARSE_SIZE:
+            height, width = frame['shape']
+            if small.shape[0] > height or small.shape[1] > width:
+                return None
+            x, y, sad = _sad_match(frame['small'], small)
+            if 1.0 - sad / (255.0 * small.size) < threshold * 0.9:
+                return None
+            x0 = max(x * PYRAMID_FACTOR - REFINE_MARGIN, 0)
+            y0 = max(y * PYRAMID_FACTOR - REFINE_MARGIN, 0)
+            roi = gray[y0:y0 + h + 2 * REFINE_MARGIN, x0:x0 + w + 2 * REFINE_MARGIN]
         
+        if roi.shape[0] < h or roi.shape[1] < w:
+            return None
+        
+        x, y, sad = _sad_match(roi, template)
+        score = 1.0 - sad / (255.0 * template.size)
+        if score >= threshold:
+            return (x0 + x + w // 2, y0 + y + h // 2, score)
         return None
     
-    def ocr_text(self, image: np.ndarray, region: Optional[Tuple[int, int, int, int]] = None) -> str:
-        """Extract text from image using OCR"""
+    def _match_all(self, gray: np.ndarray, template_names,
+                   threshold: Optional[float] = None) -> Dict[str, Optional[Tuple[int, int, float]]]:
+        """
+        Match several templates against one grayscale screenshot, coarse-to-fine.
+        All coarse passes share one FFT of the 1/4-scale frame; the best coarse
+        candidate of each template is then verified at full resolution in a small ROI.
+        threshold defaults to MATCH_THRESHOLDS for each template's method.
+        Returns: {template_name: (center_x, center_y, max_val) or None} for templates that exist
+        """
+        frame = self._frame_data(gray)
+        
+        results = {}
+        for template_name in template_names:
+            record = self._load_template(template_name)
+            if record is None:
+                logger.warning(f"Template {template_name} not found")
+                continue
+            
+            template_threshold = threshold
+            if template_threshold is None:
+                template_threshold = MATCH_THRESHOLDS[self._match_method(template_name)]
+            
+            if record['sad']:
+                results[template_name] = self._sad_template_match(template_name, frame,
+                                                                  template_threshold)
+                continue
+            
+            if min(record['small'].shape[:2]) < MIN_COARSE_SIZE:
+                # Too small to survive downscaling; search at full resolution
+                results[template_name] = self._refine_match(template_name, frame['gray'], None,
+                                                            template_threshold)
+                continue
+            
+            coarse = self._coarse_match(template_name, frame)
+            if coarse is None or coarse[0] < template_threshold * 0.9:
+                results[template_name] = None
+            else:
+                results[template_name] = self._refine_match(template_name, frame['gray'], coarse[1],
+                                                            template_threshold)
+        
+        return results
+    
+    def find_template(self, template_name: str, gray: np.ndarray, 
+                     threshold: Optional[float] = None) -> Optional[Tuple[int, int, float]]:
+        """Find template in a grayscale screenshot using template matching.
+        Returns (center_x, center_y, max_val) or None."""
+        return self._match_all(gray, [template_name], threshold).get(template_name)
+    
+    def preprocess_ocr(self, image: np.ndarray) -> np.ndarray:
+        """Binarize an image for OCR: grayscale, CLAHE contrast boost, then Otsu threshold"""
+        gray = self._gray(image)
+        if gray.dtype != np.uint8:
+            gray = gray.astype(np.uint8)  # CLAHE and Otsu need 8-bit input
+        gray = self._clahe.apply(gray)
+        return cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+    
+    def ocr_text(self, image: np.ndarray, region: Optional[Tuple[int, int, int, int]] = None,
+                 pre_binarized: bool = False) -> str:
+        """Extract text from image using OCR.
+        Pass pre_binarized=True for output of preprocess_ocr to skip preprocessing."""
         try:
             if region:
                 x1, y1, x2, y2 = region
                 image = image[y1:y2, x1:x2]
             
-            # Convert to grayscale for better OCR
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
             # Apply preprocessing for better text recognition
-            gray = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+            binary = image if pre_binarized else self.preprocess_ocr(image)
             
             # Extract text
-            text = pytesseract.image_to_string(gray, config='--psm 6')
+            if self._tess is not None:
+                self._tess.SetImage(Image.fromarray(binary))
+                text = self._tess.GetUTF8Text()
+            else:
+                text = pytesseract.image_to_string(binary, config='--psm 6')
             return text.strip()
         except Exception as e:
             logger.error(f"OCR failed: {e}")
             return ""
     
-    def click_at(self, x: int, y: int, delay: float = 0.5):
-        """Click at specified coordinates"""
+    def _make_clicker(self):
+        """Pick the cheapest click primitive for this platform: SendInput on Windows,
+        XTest on X11, pyautogui otherwise. Returns a click(x, y) callable."""
+        if sys.platform == 'win32':
+            user32 = ctypes.windll.user32
+            # Built once; every click replays the same down/up pair at the cursor
+            inputs = (_INPUT * 2)(
+                _INPUT(INPUT_MOUSE, _MOUSEINPUT(0, 0, 0, MOUSEEVENTF_LEFTDOWN, 0, 0)),
+                _INPUT(INPUT_MOUSE, _MOUSEINPUT(0, 0, 0, MOUSEEVENTF_LEFTUP, 0, 0)))
+            input_size = ctypes.sizeof(_INPUT)
+            
+            def click(x, y):
+                user32.SetCursorPos(int(x), int(y))
+                user32.SendInput(2, inputs, input_size)
+            return click
+        
+        if xtest is not None and os.environ.get('DISPLAY'):
+            try:
+                disp = xdisplay.Display()
+            except Exception as e:
+                logger.warning(f"XTest unavailable, using pyautogui: {e}")
+            else:
+                def click(x, y):
+                    xtest.fake_input(disp, X.MotionNotify, x=int(x), y=int(y))
+                    xtest.fake_input(disp, X.ButtonPress, 1)
+                    xtest.fake_input(disp, X.ButtonRelease, 1)
+                    disp.sync()
+                return click
+        
+        return pyautogui.click
+    
+    def click_at(self, x: int, y: int, delay: float = 0.05):
+        """Click at specified coordinates.
+        delay only covers input delivery; the main loop's change gate waits for the screen."""
         try:
             # Focus game window before clicking
-            if self.config.getboolean('Automation', 'window_detection_enabled', fallback=True):
+            if self._window_detect:
                 self.window_detector.focus_game_window()
                 time.sleep(0.1)  # Brief delay for window focus
             
-            pyautogui.click(x, y)
+            self._click(x, y)
             time.sleep(delay)
             logger.info(f"Clicked at ({x}, {y})")
         except Exception as e:
             logger.error(f"Failed to click at ({x}, {y}): {e}")
             self.session_stats['errors_encountered'] += 1
     
-    def detect_screen(self, screenshot: np.ndarray) -> str:
-        """Detect current screen based on UI elements"""
-        # Check for main menu
-        if self.find_template('main_menu', screenshot):
-            return "main_menu"
-        
-        # Check for training screen
-        if self.find_template('training_screen', screenshot):
-            return "training_screen"
-        
-        # Check for race screen
-        if self.find_template('race_screen', screenshot):
-            return "race_screen"
+    def detect_screen(self, gray: np.ndarray, prev: str = "unknown") -> str:
+        """Detect current screen based on UI elements.
+        The likely successors of prev are tried first; the rest only on a miss."""
+        # All screen templates are matched against one shared FFT of the frame
+        successors = SCREEN_TRANSITIONS.get(prev, ())
+        if successors:
+            matches = self._match_all(gray, successors)
+            for screen in successors:
+                if matches.get(screen):
+                    return screen
         
-        # Check for event screen
-        if self.find_template('event_screen', screenshot):
-            return "event_screen"
+        remaining = [screen for screen in SCREEN_TEMPLATES if screen not in successors]
+        matches = self._match_all(gray, remaining)
+        for screen in remaining:
+            if matches.get(screen):
+                return screen
         
         return "unknown"
     
-    def handle_main_menu(self):
+    def handle_main_menu(self, gray: np.ndarray):
         """Handle main menu actions"""
         logger.info("Handling main menu")
-        screenshot = self.capture_screen()
         
         # Look for training button
-        training_btn = self.find_template('training_button', screenshot)
+        training_btn = self.find_template('training_button', gray)
         if training_btn:
-            x, y = (training_btn[0] + training_btn[2]) // 2, (training_btn[1] + training_btn[3]) // 2
+            x, y, _ = training_btn
             self.click_at(x, y)
             return True
         
         return False
     
-    def handle_training_screen(self):
+    def handle_training_screen(self, gray: np.ndarray):
         """Handle training screen actions"""
         logger.info("Handling training screen")
-        screenshot = self.capture_screen()
         
         # Check available training options
         training_options = ['speed_train', 'stamina_train', 'power_train', 
                           'guts_train', 'intelligence_train', 'technique_train']
         
+        matches = self._match_all(gray, training_options)
         for option in training_options:
-            btn = self.find_template(option, screenshot)
+            btn = matches.get(option)
             if btn:
-                x, y = (btn[0] + btn[2]) // 2, (btn[1] + btn[3]) // 2
+                x, y, _ = btn
                 self.click_at(x, y)
                 return True
         
         return False
     
-    def handle_event_screen(self):
+    def handle_event_screen(self, gray: np.ndarray):
         """Handle event screen actions"""
         logger.info("Handling event screen")
-        screenshot = self.capture_screen()
         
         # Look for confirm/continue button
-        confirm_btn = self.find_template('confirm_button', screenshot)
+        confirm_btn = self.find_template('confirm_button', gray)
         if confirm_btn:
-            x, y = (confirm_btn[0] + confirm_btn[2]) // 2, (confirm_btn[1] + confirm_btn[3]) // 2
+            x, y, _ = confirm_btn
             self.click_at(x, y)
             return True
         
         return False
     
-    def handle_race_screen(self):
+    def handle_race_screen(self, gray: np.ndarray):
         """Handle race screen actions"""
         logger.info("Handling race screen")
-        screenshot = self.capture_screen()
         
         # Check if we should skip race
-        if self.config.getboolean('Training', 'skip_races', fallback=False):
-            skip_btn = self.find_template('skip_race_button', screenshot)
+        if self._skip_races:
+            skip_btn = self.find_template('skip_race_button', gray)
             if skip_btn:
-                x, y = (skip_btn[0] + skip_btn[2]) // 2, (skip_btn[1] + skip_btn[3]) // 2
+                x, y, _ = skip_btn
                 self.click_at(x, y)
                 return True
         
         # Look for race start button
-        start_btn = self.find_template('race_start_button', screenshot)
+        start_btn = self.find_template('race_start_button', gray)
         if start_btn:
-            x, y = (start_btn[0] + start_btn[2]) // 2, (start_btn[1] + start_btn[3]) // 2
+            x, y, _ = start_btn
             self.click_at(x, y)
             return True
         
         return False
     
-    def handle_race_result(self):
+    def handle_race_result(self, gray: np.ndarray):
         """Handle race result screen"""
         logger.info("Handling race result screen")
-        screenshot = self.capture_screen()
         
         # Look for continue button to proceed
-        continue_btn = self.find_template('continue_button', screenshot)
+        continue_btn = self.find_template('continue_button', gray)
         if continue_btn:
-            x, y = (continue_btn[0] + continue_btn[2]) // 2, (continue_btn[1] + continue_btn[3]) // 2
+            x, y, _ = continue_btn
             self.click_at(x, y)
             self.session_stats['races_completed'] += 1
             return True
         
         return False
     
-    def handle_training_result(self):
+    def handle_training_result(self, gray: np.ndarray):
         """Handle training result screen"""
         logger.info("Handling training result screen")
-        screenshot = self.capture_screen()
         
         # Look for continue button
-        continue_btn = self.find_template('continue_button', screenshot)
+        continue_btn = self.find_template('continue_button', gray)
         if continue_btn:
-            x, y = (continue_btn[0] + continue_btn[2]) // 2, (continue_btn[1] + continue_btn[3]) // 2
+            x, y, _ = continue_btn
             self.click_at(x, y)
             self.session_stats['training_sessions'] += 1
             return True
         
         return False
     
-    def handle_choice_screen(self):
+    def handle_choice_screen(self, gray: np.ndarray):
         """Handle choice/event screen with multiple options"""
         logger.info("Handling choice screen")
-        screenshot = self.capture_screen()
         
         # Try to read the choice text using OCR
-        choice_text = self.ocr_text(screenshot)
+        choice_text = self.ocr_text(gray)
         logger.info(f"Choice text: {choice_text}")
         
         # Look for the first option (usually the most positive one)
-        option_btn = self.find_template('choice_option_1', screenshot)
+        option_btn = self.find_template('choice_option_1', gray)
         if option_btn:
-            x, y = (option_btn[0] + option_btn[2]) // 2, (option_btn[1] + option_btn[3]) // 2
+            x, y, _ = option_btn
             self.click_at(x, y)
             self.session_stats['events_handled'] += 1
             return True
         
         return False
     
-    def check_for_errors(self, screenshot: np.ndarray) -> bool:
+    def check_for_errors(self, gray: np.ndarray) -> bool:
         """Check for common error screens or dialogs"""
-        # Check for error dialogs
-        error_indicators = ['error', 'failed', 'connection lost', 'retry']
-        screenshot_text = self.ocr_text(screenshot).lower()
+        if self._load_template('error_dialog') is not None:
+            # Cheap template match first; OCR only the dialog box when one is showing
+            dialog = self.find_template('error_dialog', gray)
+            if not dialog:
+                return False
+            
+            cx, cy, _ = dialog
+            w, h = self._load_template('error_dialog')['size']
+            x1, y1 = cx - w // 2, cy - h // 2
+            screenshot_text = self.ocr_text(gray, region=(x1, y1, x1 + w, y1 + h))
+        else:
+            screenshot_text = self.ocr_text(gray)
         
-        for indicator in error_indicators:
-            if indicator in screenshot_text:
-                logger.warning(f"Error detected: {indicator}")
-                return True
+        match = self._error_re.search(screenshot_text)
+        if match:
+            logger.warning(f"Error detected: {match.group(0).lower()}")
+            return True
         
         return False
     
     def get_session_stats(self) -> Dict[str, int]:
-        """Get current session statistics"""
-        return self.session_stats.copy()
+        """Get a snapshot of the current session statistics"""
+        return dict(self.session_stats)
     
     def run_automation(self):
         """Main automation loop"""
@@ -338,7 +805,7 @@ class UmaMusumeAutomation:
         self.running = True
         
         # Try to detect game window
-        if self.config.getboolean('Automation', 'window_detection_enabled', fallback=True):
+        if self._window_detect:
             self.game_region = self.window_detector.get_game_region()
             if self.game_region:
                 logger.info(f"Game window detected: {self.game_region}")
@@ -348,21 +815,49 @@ class UmaMusumeAutomation:
         consecutive_unknown_screens = 0
         max_unknown_screens = 10
         
+        # Thumbnail of the last frame that went through detection
+        prev_thumb = None
+        last_detection = 0.0
+        
+        # Capture runs on its own thread so grabbing overlaps with detection
+        while not self._frame_q.empty():
+            self._frame_q.get_nowait()
+        capture_thread = threading.Thread(target=self._capture_worker, daemon=True)
+        capture_thread.start()
+        
         while self.running:
             try:
-                screenshot = self.capture_screen()
-                if screenshot is None:
+                try:
+                    screenshot = self._frame_q.get(timeout=2)
+                except queue.Empty:
                     logger.warning("Failed to capture screenshot")
-                    time.sleep(1)
                     continue
                 
+                # Only run detection when the screen changed, or when it has been static
+                # for screenshot_delay (so a missed click still gets retried)
+                thumb = self._thumbnail(screenshot)
+                now = time.monotonic()
+                static = (prev_thumb is not None
+                          and cv2.absdiff(thumb, prev_thumb).mean() < CHANGE_THRESHOLD)
+                # A static screen also means the window is unlikely to move; poll it less
+                self.window_detector.set_idle(static)
+                if static and now - last_detection < self._screenshot_delay:
+                    continue
+                prev_thumb = thumb
+                last_detection = now
+                
+                # Matching and OCR all work on one float32 grayscale conversion of the frame,
+                # made only for frames that passed the change gate
+                gray = self._gray(screenshot).astype(np.float32)
+                
                 # Check for errors first
-                if self.check_for_errors(screenshot):
+                if self.check_for_errors(gray):
                     logger.warning("Error detected, waiting before retry")
                     time.sleep(3)
                     continue
                 
-                current_screen = self.detect_screen(screenshot)
+                current_screen = self.detect_screen(gray, self.current_screen)
+                self.current_screen = current_screen
                 logger.info(f"Current screen: {current_screen}")
                 
                 # Reset unknown screen counter if we found a known screen
@@ -377,33 +872,32 @@ class UmaMusumeAutomation:
                 # Handle different screens
                 handled = False
                 if current_screen == "main_menu":
-                    handled = self.handle_main_menu()
+                    handled = self.handle_main_menu(gray)
                 elif current_screen == "training_screen":
-                    handled = self.handle_training_screen()
+                    handled = self.handle_training_screen(gray)
                 elif current_screen == "event_screen":
-                    handled = self.handle_event_screen()
+                    handled = self.handle_event_screen(gray)
                 elif current_screen == "race_screen":
-                    handled = self.handle_race_screen()
+                    handled = self.handle_race_screen(gray)
                 elif current_screen == "race_result":
-                    handled = self.handle_race_result()
+                    handled = self.handle_race_result(gray)
                 elif current_screen == "training_result":
-                    handled = self.handle_training_result()
+                    handled = self.handle_training_result(gray)
                 elif current_screen == "choice_screen":
-                    handled = self.handle_choice_screen()
+                    handled = self.handle_choice_screen(gray)
                 else:
                     logger.warning(f"Unknown screen detected: {current_screen}")
                     # Try to click continue button as fallback
-                    continue_btn = self.find_template('continue_button', screenshot)
+                    continue_btn = self.find_template('continue_button', gray)
                     if continue_btn:
-                        x, y = (continue_btn[0] + continue_btn[2]) // 2, (continue_btn[1] + continue_btn[3]) // 2
+                        x, y, _ = continue_btn
                         self.click_at(x, y)
                         handled = True
                 
-                # If no action was taken, wait a bit longer
-                if not handled:
-                    time.sleep(float(self.config.get('Automation', 'screenshot_delay', fallback='1.0')))
-                else:
-                    time.sleep(0.5)  # Shorter delay after successful action
+                # Let the click's transition animation settle; when nothing was handled
+                # the change gate above paces the loop instead of a fixed sleep
+                if handled:
+                    time.sleep(0.5)
                 
             except KeyboardInterrupt:
                 logger.info("Automation stopped by user")
@@ -414,9 +908,18 @@ class UmaMusumeAutomation:
                 time.sleep(2)
         
         self.running = False
+        capture_thread.join(timeout=2)
         logger.info("Automation stopped")
         logger.info(f"Session stats: {self.get_session_stats()}")
 
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
 class AutomationGUI:
     def __init__(self):
         self.automation = UmaMusumeAutomation()
@@ -424,6 +927,15 @@ class AutomationGUI:
         self.root.title("Uma Musume PC Automation")
         self.root.geometry("600x400")
         self.setup_gui()
+        
+        # Log records from the automation thread are queued and drained by a Tk timer
+        # that runs for the life of the window, whether or not automation is running
+        self._log_q = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        log_handler = _DroppingQueueHandler(self._log_q)
+        log_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s', '%H:%M:%S'))
+        logger.addHandler(log_handler)
+        self.automation_thread = None
+        self.root.after(LOG_POLL_MS, self.poll_log_queue)
     
     def setup_gui(self):
         """Setup the GUI interface"""
@@ -501,6 +1013,25 @@ class AutomationGUI:
         self.log_text.insert(tk.END, f"{time.strftime('%H:%M:%S')} - {message}\n")
         self.log_text.see(tk.END)
     
+    def drain_log_queue(self):
+        """Move queued log records into the log widget with one insert"""
+        lines = []
+        for _ in range(LOG_BATCH):
+            try:
+                record = self._log_q.get_nowait()
+            except queue.Empty:
+                break
+            lines.append(record.getMessage() + "\n")
+        
+        if lines:
+            self.log_text.insert(tk.END, "".join(lines))
+            self.log_text.see(tk.END)
+    
+    def poll_log_queue(self):
+        """Drain queued log records every LOG_POLL_MS"""
+        self.drain_log_queue()
+        self.root.after(LOG_POLL_MS, self.poll_log_queue)
+    
     def update_stats_display(self):
         """Update the session statistics display"""
         stats = self.automation.get_session_stats()
@@ -518,6 +1049,7 @@ class AutomationGUI:
         self.automation.config.set('Training', 'priority_stats', self.priority_stats.get())
         self.automation.config.set('Training', 'skip_races', str(self.skip_races.get()))
         self.automation.config.set('Training', 'farm_fans', str(self.farm_fans.get()))
+        self.automation.apply_config()
         
         # Start automation in separate thread
         self.automation_thread = threading.Thread(target=self.automation.run_automation)
@@ -537,9 +1069,10 @@ class AutomationGUI:
         self.update_stats_display()  # Final stats update
     
     def update_stats_timer(self):
-        """Update stats display periodically"""
-        if self.automation.running:
-            self.update_stats_display()
+        """Update stats display periodically while the automation thread is alive"""
+        self.update_stats_display()
+        # The thread sets running itself, so check the thread rather than the flag
+        if self.automation_thread is not None and self.automation_thread.is_alive():
             self.root.after(1000, self.update_stats_timer)  # Update every second
     
     def run(self):
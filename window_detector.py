@@ -13,130 +13,338 @@ from typing import Tuple, Optional, List
 import subprocess
 import re
 import platform
+import ctypes
+
+try:
+    import Quartz
+except ImportError:
+    Quartz = None
+
+try:
+    from Xlib import X, Xatom, display as xdisplay
+except ImportError:
+    xdisplay = None
 
 logger = logging.getLogger(__name__)
 
+# Substrings that identify the game in window titles and owner names
+_TITLE_RE = re.compile(r'Uma Musume|Pretty Derby')
+
+# Signed integers in osascript output
+_NUM_RE = re.compile(rb'-?\d+')
+
+# Frontmost app and game window geometry in one osascript run, trying both process names
+_MACOS_WINDOW_SCRIPT = '''
+set AppleScript's text item delimiters to ", "
+tell application "System Events"
+    set frontName to name of first process whose frontmost is true
+    try
+        set geometry to (position and size of window 1 of process "Uma Musume") as text
+    on error
+        try
+            set geometry to (position and size of window 1 of process "Uma Musume Pretty Derby") as text
+        on error
+            set geometry to ""
+        end try
+    end try
+    return frontName & "|" & geometry
+end tell
+'''
+
+# NSApplicationActivateIgnoringOtherApps, for NSRunningApplication.activateWithOptions_
+NS_ACTIVATE_IGNORING_OTHER_APPS = 1 << 1
+
+class RECT(ctypes.Structure):
+    _fields_ = [('left', ctypes.c_long), ('top', ctypes.c_long),
+                ('right', ctypes.c_long), ('bottom', ctypes.c_long)]
+
+# Direct user32 bindings on Windows; a private WinDLL so argtypes don't leak into other users
+if platform.system() == "Windows":
+    from ctypes import wintypes
+    _user32 = ctypes.WinDLL('user32', use_last_error=True)
+    _WNDENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    _user32.EnumWindows.argtypes = [_WNDENUMPROC, wintypes.LPARAM]
+    _user32.IsWindow.argtypes = [wintypes.HWND]
+    _user32.IsWindowVisible.argtypes = [wintypes.HWND]
+    _user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+    _user32.GetWindowRect.argtypes = [wintypes.HWND, ctypes.POINTER(RECT)]
+    _user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+    _user32.GetForegroundWindow.restype = wintypes.HWND
+else:
+    _user32 = None
+
 class WindowDetector:
+    # No per-instance __dict__; every slot is set in __init__ (None where the platform doesn't use it)
+    __slots__ = (
+        'system', 'game_window', 'window_rect', '_region_cache',
+        '_rect_cache_ts', '_rect_cache_ttl', '_is_active_cache', '_active_cache_ts',
+        '_active_cache_ttl', '_ttl_multiplier', '_screen_size', '_poll_interval', '_poll_max',
+        '_hwnd', '_pid', '_enum_proc', '_enum_found', '_title_buf', '_rect', '_pid_buf',
+        '_ws', '_game_app', '_display', '_net_client_list', '_net_wm_name',
+        '_find_impl', '_is_active_impl', '_focus_impl'
+    )
+    
     def __init__(self):
         self.system = platform.system()
         self.game_window = None
         self.window_rect = None
+        self._region_cache = None  # window_rect as (left, top, right, bottom)
+        # Lookups spawn OS helpers, so results (including misses) are reused for a while
+        self._rect_cache_ts = None
+        self._rect_cache_ttl = 3.0
+        self._is_active_cache = None
+        self._active_cache_ts = None
+        self._active_cache_ttl = 1.0
+        # Scales both TTLs; raised by set_idle while the automation has nothing to do
+        self._ttl_multiplier = 1.0
+        # Windows: last game window handle and its process; handles can be reused
+        # by other windows once the game's is destroyed, so both must still match
+        self._hwnd = None
+        self._pid = None
+        # Screen size for the full-screen fallbacks, refreshed with the window lookup
+        self._screen_size = pyautogui.size()
+        # detect_with_backoff polling interval: grows while the window stays put
+        self._poll_interval = 0.5
+        self._poll_max = 10.0
+        
+        # In-process frontmost/activate queries on macOS (osascript if PyObjC is missing)
+        self._ws = None
+        self._game_app = None
+        if self.system == "Darwin":
+            try:
+                import AppKit
+                self._ws = AppKit.NSWorkspace.sharedWorkspace()
+            except ImportError:
+                logger.debug("AppKit not available, using osascript")
+        
+        # Windows: EnumWindows callback and buffers built once and reused for every lookup
+        self._enum_proc = None
+        self._enum_found = None
+        self._title_buf = None
+        self._rect = None
+        self._pid_buf = None
+        if self.system == "Windows":
+            self._enum_proc = _WNDENUMPROC(self._enum_windows_callback)
+            self._title_buf = ctypes.create_unicode_buffer(256)
+            self._rect = RECT()
+            self._pid_buf = wintypes.DWORD()
+        
+        # In-process X11 connection on Linux (wmctrl if python-xlib is missing)
+        self._display = None
+        self._net_client_list = None
+        self._net_wm_name = None
+        if self.system == "Linux" and xdisplay is not None:
+            try:
+                self._display = xdisplay.Display()
+                self._net_client_list = self._display.intern_atom('_NET_CLIENT_LIST')
+                self._net_wm_name = self._display.intern_atom('_NET_WM_NAME')
+            except Exception as e:
+                self._display = None
+                logger.debug(f"X display not available, using wmctrl: {e}")
+        
+        # Platform-specific implementations, bound once; None where unsupported
+        self._find_impl = {
+            'Darwin': self._find_window_macos,
+            'Windows': self._find_window_windows,
+            'Linux': self._find_window_xlib if self._display is not None else self._find_window_linux
+        }.get(self.system)
+        if self._find_impl is None:
+            logger.error(f"Unsupported operating system: {self.system}")
+        
+        self._is_active_impl = None
+        self._focus_impl = None
+        if self.system == "Darwin":
+            if self._ws is not None:
+                self._is_active_impl = self._is_active_appkit
+                self._focus_impl = self._focus_appkit
+            else:
+                self._is_active_impl = self._is_active_osascript
+                self._focus_impl = self._focus_osascript
+        elif self.system == "Windows":
+            self._is_active_impl = self._is_active_windows
         
     def find_uma_musume_window(self) -> Optional[Tuple[int, int, int, int]]:
         """
-        Find Uma Musume game window and return its coordinates
+        Find Uma Musume game window and return its coordinates.
+        The result is cached for _rect_cache_ttl seconds (scaled by set_idle);
+        see invalidate_cache().
         Returns: (x, y, width, height) or None if not found
         """
-        if self.system == "Darwin":  # macOS
-            return self._find_window_macos()
-        elif self.system == "Windows":
-            return self._find_window_windows()
-        elif self.system == "Linux":
-            return self._find_window_linux()
+        now = time.monotonic()
+        ttl = self._rect_cache_ttl * self._ttl_multiplier
+        if self._rect_cache_ts is not None and now - self._rect_cache_ts < ttl:
+            return self.window_rect
+        
+        self._screen_size = pyautogui.size()  # Resolution may have changed too
+        self.window_rect = self._find_impl() if self._find_impl else None
+        if self.window_rect:
+            x, y, width, height = self.window_rect
+            self._region_cache = (x, y, x + width, y + height)
         else:
-            logger.error(f"Unsupported operating system: {self.system}")
-            return None
+            self._region_cache = None
+        self._rect_cache_ts = now
+        return self.window_rect
+    
+    def detect_with_backoff(self) -> Tuple[Optional[Tuple[int, int, int, int]], float]:
+        """
+        Query the OS for the game window and suggest when to poll again.
+        The delay grows 1.5x for every unchanged result, up to _poll_max,
+        and drops back to 0.5s when the window appears, moves or disappears.
+        Returns: ((x, y, width, height) or None, next_delay)
+        """
+        last_rect = self.window_rect
+        self.invalidate_cache()
+        rect = self.find_uma_musume_window()
+        
+        if rect == last_rect:
+            self._poll_interval = min(self._poll_interval * 1.5, self._poll_max)
+        else:
+            self._poll_interval = 0.5
+        return rect, self._poll_interval
+    
+    def invalidate_cache(self):
+        """Force the next lookup to query the OS, e.g. after a focus change or window move"""
+        self._rect_cache_ts = None
+        self._active_cache_ts = None
+    
+    def set_idle(self, idle: bool):
+        """Poll the OS 5x less often while idle, e.g. while the game screen is static"""
+        self._ttl_multiplier = 5.0 if idle else 1.0
     
     def _find_window_macos(self) -> Optional[Tuple[int, int, int, int]]:
         """Find Uma Musume window on macOS"""
+        if Quartz is not None:
+            return self._find_window_quartz()
+        
         try:
-            # Use osascript to get window information
-            cmd = [
-                'osascript', '-e',
-                'tell application "System Events" to get position and size of window 1 of process "Uma Musume"'
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                # Parse the output: "x, y, width, height"
-                coords = result.stdout.strip().split(', ')
-                if len(coords) == 4:
-                    x, y, width, height = map(int, coords)
-                    return (x, y, width, height)
-            
-            # Alternative: try to find by window title
-            cmd = [
-                'osascript', '-e',
-                'tell application "System Events" to get position and size of window 1 of process "Uma Musume Pretty Derby"'
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                coords = result.stdout.strip().split(', ')
-                if len(coords) == 4:
-                    x, y, width, height = map(int, coords)
-                    return (x, y, width, height)
-                    
+            return self._query_window_osascript()
         except Exception as e:
             logger.error(f"Error finding window on macOS: {e}")
         
         return None
     
+    def _query_window_osascript(self) -> Optional[Tuple[int, int, int, int]]:
+        """
+        One osascript call for both the frontmost app and the game window geometry.
+        Refreshes the active-window cache as a side effect.
+        Returns: (x, y, width, height) or None if neither game process has a window
+        """
+        cmd = ['osascript', '-e', _MACOS_WINDOW_SCRIPT]
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        if result.returncode != 0:
+            return None
+        
+        # Parse the output: "frontmost|x, y, width, height"
+        frontmost, _, geometry = result.stdout.partition(b'|')
+        self._is_active_cache = "Uma Musume" in frontmost.decode('ascii', 'ignore')
+        self._active_cache_ts = time.monotonic()
+        
+        # Pull the numbers out directly; tolerates spacing and separator drift
+        nums = _NUM_RE.findall(geometry)
+        if len(nums) >= 4:
+            return (int(nums[0]), int(nums[1]), int(nums[2]), int(nums[3]))
+        return None
+    
+    def _find_window_quartz(self) -> Optional[Tuple[int, int, int, int]]:
+        """Find Uma Musume window on macOS via the window server, without spawning osascript"""
+        try:
+            windows = Quartz.CGWindowListCopyWindowInfo(
+                Quartz.kCGWindowListExcludeDesktopElements | Quartz.kCGWindowListOptionOnScreenOnly,
+                Quartz.kCGNullWindowID)
+            for window in windows:
+                owner = window.get('kCGWindowOwnerName') or ''
+                # Layer 0 is the normal window layer; skips menus and overlays
+                if window.get('kCGWindowLayer') != 0:
+                    continue
+                if _TITLE_RE.search(owner):
+                    bounds = window['kCGWindowBounds']
+                    return (int(bounds['X']), int(bounds['Y']),
+                            int(bounds['Width']), int(bounds['Height']))
+        except Exception as e:
+            logger.error(f"Error finding window via Quartz: {e}")
+        
+        return None
+    
+    def _enum_windows_callback(self, hwnd, _):
+        """EnumWindows callback: stop at the first visible window titled like the game"""
+        if not _user32.IsWindowVisible(hwnd):
+            return True
+        
+        _user32.GetWindowTextW(hwnd, self._title_buf, len(self._title_buf))
+        window_text = self._title_buf.value.lower()
+        if any(x in window_text for x in ["template_creator", "window_detector"]):
+            return True
+        normalized_text = window_text.replace(" ", "")
+        if normalized_text in ("umamusume", "umamusumeprettyderby"):
+            self._enum_found = hwnd
+            return False
+        return True
+    
+    def _window_pid(self, hwnd) -> int:
+        """Process ID owning hwnd"""
+        _user32.GetWindowThreadProcessId(hwnd, ctypes.byref(self._pid_buf))
+        return self._pid_buf.value
+    
     def _find_window_windows(self) -> Optional[Tuple[int, int, int, int]]:
         """Find Uma Musume window on Windows"""
         try:
-            import win32gui
-            import win32con
+            # Reuse the last game window while it exists; enumerate only on a miss
+            hwnd = self._hwnd
+            if hwnd is None or not _user32.IsWindow(hwnd) or self._window_pid(hwnd) != self._pid:
+                self._enum_found = None
+                _user32.EnumWindows(self._enum_proc, 0)
+                hwnd = self._hwnd = self._enum_found
+                self._pid = self._window_pid(hwnd) if hwnd is not None else None
             
-            def enum_windows_callback(hwnd, windows):
-                if not win32gui.IsWindowVisible(hwnd):
-                    return True
-                
-                window_text = win32gui.GetWindowText(hwnd)
-                if any(x in window_text.lower() for x in ["template_creator", "window_detector"]):
-                    return True
-                normalized_text = window_text.lower().replace(" ", "")
-                game_titles = ["umamusume", "umamusumeprettyderby"]
-                if normalized_text in game_titles:
-                    try:
-                        rect = win32gui.GetWindowRect(hwnd)
-                        x, y, w, h = rect[0], rect[1], rect[2] - rect[0], rect[3] - rect[1]
-                        windows.append((x, y, w, h))
-                    except Exception as e:
-                        logger.error(f"Error getting window rect: {e}")
-                return True
-            
-            windows = []
-            win32gui.EnumWindows(enum_windows_callback, windows)
+            if hwnd is not None and _user32.GetWindowRect(hwnd, ctypes.byref(self._rect)):
+                rect = self._rect
+                return (rect.left, rect.top, rect.right - rect.left, rect.bottom - rect.top)
+        except Exception as e:
+            logger.error(f"Error finding window on Windows: {e}")
+        
+        return None
+    
+    def _find_window_xlib(self) -> Optional[Tuple[int, int, int, int]]:
+        """Find Uma Musume window on Linux by reading the window manager's client list"""
+        try:
+            root = self._display.screen().root
+            client_list = root.get_full_property(self._net_client_list, Xatom.WINDOW)
+            if client_list is None:
+                # Window manager doesn't publish _NET_CLIENT_LIST
+                return self._find_window_linux()
             
-            if windows:
-                return windows[0]  # Return first matching window
+            for window_id in client_list.value:
+                window = self._display.create_resource_object('window', window_id)
+                name = window.get_full_property(self._net_wm_name, X.AnyPropertyType)
+                title = name.value if name else window.get_wm_name()
+                if isinstance(title, bytes):
+                    title = title.decode('utf-8', 'replace')
                 
-        except ImportError:
-            logger.warning("win32gui not available, trying alternative method")
-            # Fallback: try to find by process name
-            try:
-                result = subprocess.run(['tasklist', '/FI', 'IMAGENAME eq UmaMusume.exe'], 
-                                      capture_output=True, text=True)
-                if "UmaMusume.exe" in result.stdout:
-                    # Window exists, use screen center as fallback
-                    screen_width, screen_height = pyautogui.size()
-                    return (0, 0, screen_width, screen_height)
-            except Exception as e:
-                logger.error(f"Error finding window on Windows: {e}")
+                if title and _TITLE_RE.search(title):
+                    geometry = window.get_geometry()
+                    # Position of the root origin in window coordinates, i.e. minus the window's
+                    origin = window.translate_coords(root, 0, 0)
+                    return (-origin.x, -origin.y, geometry.width, geometry.height)
+        except Exception as e:
+            logger.error(f"Error finding window via Xlib: {e}")
         
         return None
     
     def _find_window_linux(self) -> Optional[Tuple[int, int, int, int]]:
         """Find Uma Musume window on Linux"""
         try:
-            # Try using wmctrl
-            result = subprocess.run(['wmctrl', '-l'], capture_output=True, text=True)
+            # Try using wmctrl; -G puts the geometry in the listing, so one call is enough
+            result = subprocess.run(['wmctrl', '-lG'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
             if result.returncode == 0:
-                lines = result.stdout.split('\n')
+                # ASCII is enough to match the title; other characters are dropped
+                lines = result.stdout.decode('ascii', 'ignore').split('\n')
                 for line in lines:
-                    if 'Uma Musume' in line or 'Pretty Derby' in line:
-                        # Parse window ID and get geometry
+                    if _TITLE_RE.search(line):
+                        # Columns: id desktop x y width height host title...
                         parts = line.split()
-                        if len(parts) >= 2:
-                            window_id = parts[0]
-                            geom_result = subprocess.run(['wmctrl', '-G', '-r', window_id], 
-                                                       capture_output=True, text=True)
-                            if geom_result.returncode == 0:
-                                geom_parts = geom_result.stdout.split()
-                                if len(geom_parts) >= 6:
-                                    x, y, w, h = map(int, geom_parts[2:6])
-                                    return (x, y, w, h)
+                        if len(parts) >= 6:
+                            x, y, w, h = map(int, parts[2:6])
+                            return (x, y, w, h)
         except Exception as e:
             logger.error(f"Error finding window on Linux: {e}")
         
@@ -147,38 +355,74 @@ class WindowDetector:
         Get the current game window region
         Returns: (left, top, right, bottom) for screenshot region
         """
-        if self.window_rect is None:
-            self.window_rect = self.find_uma_musume_window()
-        
-        if self.window_rect:
-            x, y, width, height = self.window_rect
-            return (x, y, x + width, y + height)
-        
-        return None
+        self.find_uma_musume_window()
+        return self._region_cache
+    
+    def _running_game_app(self):
+        """NSRunningApplication for the game, cached until it terminates"""
+        if self._game_app is None or self._game_app.isTerminated():
+            self._game_app = None
+            for app in self._ws.runningApplications():
+                if "Uma Musume" in (app.localizedName() or ""):
+                    self._game_app = app
+                    break
+        return self._game_app
     
     def is_game_window_active(self) -> bool:
-        """Check if the game window is currently active/focused"""
-        if self.system == "Darwin":
-            try:
-                cmd = ['osascript', '-e', 'tell application "System Events" to get name of first process whose frontmost is true']
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode == 0:
-                    active_app = result.stdout.strip()
-                    return "Uma Musume" in active_app
-            except Exception as e:
-                logger.error(f"Error checking active window: {e}")
+        """Check if the game window is currently active/focused; cached like the window rect"""
+        if not self._is_active_impl:
+            return True  # Assume active if we can't determine
+        
+        now = time.monotonic()
+        ttl = self._active_cache_ttl * self._ttl_multiplier
+        if self._active_cache_ts is None or now - self._active_cache_ts >= ttl:
+            self._is_active_cache = self._is_active_impl()
+            self._active_cache_ts = now
+        return self._is_active_cache
+    
+    def _is_active_appkit(self) -> bool:
+        """Frontmost-app check on macOS via NSWorkspace"""
+        app = self._ws.frontmostApplication()
+        return app is not None and "Uma Musume" in (app.localizedName() or "")
+    
+    def _is_active_windows(self) -> bool:
+        """Foreground-window check on Windows against the last found game window"""
+        hwnd = self._hwnd
+        return hwnd is None or _user32.GetForegroundWindow() == hwnd
+    
+    def _is_active_osascript(self) -> bool:
+        """Frontmost-app check on macOS via osascript"""
+        try:
+            cmd = ['osascript', '-e', 'tell application "System Events" to get name of first process whose frontmost is true']
+            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            if result.returncode == 0:
+                active_app = result.stdout.decode('ascii', 'ignore').strip()
+                return "Uma Musume" in active_app
+        except Exception as e:
+            logger.error(f"Error checking active window: {e}")
         
         return True  # Assume active if we can't determine
     
     def focus_game_window(self) -> bool:
         """Bring the game window to front"""
-        if self.system == "Darwin":
-            try:
-                cmd = ['osascript', '-e', 'tell application "Uma Musume" to activate']
-                result = subprocess.run(cmd, capture_output=True)
-                return result.returncode == 0
-            except Exception as e:
-                logger.error(f"Error focusing window: {e}")
+        if self._focus_impl:
+            self._active_cache_ts = None  # Focus state is about to change
+            return self._focus_impl()
+        return False
+    
+    def _focus_appkit(self) -> bool:
+        """Activate the game on macOS via NSRunningApplication"""
+        app = self._running_game_app()
+        return app is not None and bool(app.activateWithOptions_(NS_ACTIVATE_IGNORING_OTHER_APPS))
+    
+    def _focus_osascript(self) -> bool:
+        """Activate the game on macOS via osascript"""
+        try:
+            cmd = ['osascript', '-e', 'tell application "Uma Musume" to activate']
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return result.returncode == 0
+        except Exception as e:
+            logger.error(f"Error focusing window: {e}")
         
         return False
     
@@ -193,7 +437,8 @@ class WindowDetector:
             rel_y = (y - window_y) / window_h
             return (rel_x, rel_y)
         
-        return (x / pyautogui.size()[0], y / pyautogui.size()[1])
+        screen_w, screen_h = self._screen_size
+        return (x / screen_w, y / screen_h)
     
     def get_absolute_coordinates(self, rel_x: float, rel_y: float) -> Tuple[int, int]:
         """
@@ -205,8 +450,31 @@ class WindowDetector:
             abs_y = int(window_y + (rel_y * window_h))
             return (abs_x, abs_y)
         
-        screen_w, screen_h = pyautogui.size()
+        screen_w, screen_h = self._screen_size
         return (int(rel_x * screen_w), int(rel_y * screen_h))
+    
+    def _coordinate_frame(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Origin and size of the game window, or of the screen if no window is known"""
+        if self.window_rect:
+            window_x, window_y, window_w, window_h = self.window_rect
+            return np.array([window_x, window_y]), np.array([window_w, window_h])
+        return np.zeros(2), np.array(self._screen_size)
+    
+    def get_relative_coordinates_batch(self, points: np.ndarray) -> np.ndarray:
+        """
+        Vectorized get_relative_coordinates for an (N, 2) array of screen points
+        Returns: (N, 2) float array of relative coordinates
+        """
+        origin, size = self._coordinate_frame()
+        return (np.asarray(points) - origin) / size
+    
+    def get_absolute_coordinates_batch(self, rel_points: np.ndarray) -> np.ndarray:
+        """
+        Vectorized get_absolute_coordinates for an (N, 2) array of relative points
+        Returns: (N, 2) int array of screen coordinates
+        """
+        origin, size = self._coordinate_frame()
+        return (origin + np.asarray(rel_points) * size).astype(int)
 
 def test_window_detection():
     """Test function to verify window detection works"""